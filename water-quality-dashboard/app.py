@@ -7,25 +7,29 @@ Dashboard interativo para monitoramento de qualidade da água.
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 # ✅ IMPORTAÇÃO DO GERADOR DE DADOS
-from data_generator import generate_water_quality_data
+from data_generator import WaterQualityDataGenerator
 
 # Importações dos nossos pacotes modulares
 from components import (
     create_line_chart,
     create_radar_chart,
     create_heatmap,
-    create_metric_card,
     create_kpi_row,
     create_sidebar_filters
 )
 from utils import (
-    get_quality_status,
-    get_quality_color,
+    QUALITY_STATUSES,
+    classify_array,
     format_number,
     calculate_quality_index,
+    calculate_radar_scores,
     generate_export_filename
 )
 
@@ -71,50 +75,179 @@ st.markdown("""
 
 
 # =============================================================================
-# GERAÇÃO DE DADOS
+# CONSTANTES
 # =============================================================================
 
-# Removida a função generate_water_quality_data() do app.py
-# E adicione esta importação:
+# Rótulos dos parâmetros exibidos nos títulos dos gráficos
+PARAM_LABELS = {
+    'ph': 'pH',
+    'turbidity': 'Turbidez (NTU)',
+    'dissolved_oxygen': 'Oxigênio Dissolvido (mg/L)',
+    'temperature': 'Temperatura (°C)',
+    'conductivity': 'Condutividade (µS/cm)',
+    'total_dissolved_solids': 'Sólidos Totais Dissolvidos (mg/L)',
+    'nitrates': 'Nitratos (mg/L)'
+}
+
+# Métricas exibidas por estação: (parâmetro, rótulo, unidade)
+PARAMS_TO_SHOW = (
+    ('ph', 'pH', ''),
+    ('turbidity', 'Turbidez', ' NTU'),
+    ('dissolved_oxygen', 'O₂ Dissolvido', ' mg/L'),
+    ('temperature', 'Temperatura', '°C')
+)
 
-from data_generator import WaterQualityDataGenerator
+# Eixos do gráfico de radar, na ordem de calculate_radar_scores
+RADAR_CATEGORIES = ['pH', 'Turbidez', 'O₂', 'Temperatura', 'Condutividade']
 
-# No main():
-generator = WaterQualityDataGenerator(seed=42)
-df_full = generator.generate(days=30)
-
-# Você pode até adicionar anomalias para testar alertas:
-df_full = generator.add_anomaly(
-    df_full, 
-    station="Estação A",
-    parameter="ph", 
-    start_time=datetime.now() - timedelta(days=2),
-    duration_hours=5
-)
+
+# =============================================================================
+# GERAÇÃO DE DADOS
+# =============================================================================
+
+@st.cache_resource(ttl=300, max_entries=4)
+def load_data(
+    days: int,
+    anomaly: Optional[Tuple[str, str, datetime, int]] = None
+) -> pd.DataFrame:
+    """
+    Carrega os dados sintéticos, memorizados entre reruns do Streamlit.
+    
+    Usa cache_resource: todas as sessões e reruns recebem o mesmo DataFrame,
+    sem a cópia desserializada que o cache_data entrega a cada chamada.
+    O resultado deve ser tratado como somente leitura.
+    
+    Args:
+        days: Número de dias de dados históricos
+        anomaly: Tupla opcional (estação, parâmetro, início, duração em horas)
+                 para injetar uma anomalia de teste; faz parte da chave do cache
+    
+    Returns:
+        DataFrame com dados de qualidade da água
+    """
+    generator = WaterQualityDataGenerator(seed=42)
+    df = generator.generate(days=days)
+    
+    if anomaly is not None:
+        station, parameter, start_time, duration_hours = anomaly
+        df = generator.add_anomaly(
+            df,
+            station=station,
+            parameter=parameter,
+            start_time=start_time,
+            duration_hours=duration_hours
+        )
+    
+    # Ordena por timestamp uma única vez para que os filtros de período
+    # usem busca binária em vez de comparar todas as linhas
+    return df.sort_values('timestamp', kind='stable', ignore_index=True)
 
 
-def apply_time_filter(df: pd.DataFrame, filter_config: dict) -> pd.DataFrame:
-    """Aplica filtro temporal aos dados."""
+def time_filter_bounds(df: pd.DataFrame, filter_config: dict) -> Tuple[int, int]:
+    """
+    Retorna as posições [início, fim) do filtro temporal.
+    
+    Espera o DataFrame ordenado por timestamp (ver load_data), o que permite
+    localizar os limites com busca binária.
+    """
+    timestamps = df['timestamp']
+    
     if filter_config['type'] == 'preset':
         preset = filter_config['value']
         now = datetime.now()
         
         if preset == "Últimas 24 horas":
-            return df[df['timestamp'] >= now - timedelta(hours=24)]
+            return timestamps.searchsorted(now - timedelta(hours=24)), len(df)
         elif preset == "Últimos 7 dias":
-            return df[df['timestamp'] >= now - timedelta(days=7)]
+            return timestamps.searchsorted(now - timedelta(days=7)), len(df)
         elif preset == "Últimos 30 dias":
-            return df[df['timestamp'] >= now - timedelta(days=30)]
+            return timestamps.searchsorted(now - timedelta(days=30)), len(df)
     
     elif filter_config['type'] == 'custom':
-        start = pd.Timestamp(filter_config['start'])
-        end = pd.Timestamp(filter_config['end'])
-        return df[(df['timestamp'].dt.date >= start.date()) & 
-                  (df['timestamp'].dt.date <= end.date())]
+        start = pd.Timestamp(filter_config['start']).normalize()
+        end = pd.Timestamp(filter_config['end']).normalize() + timedelta(days=1)
+        return timestamps.searchsorted(start), timestamps.searchsorted(end)
     
+    return 0, len(df)
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Aplica filtros de período e estação."""
+    start, stop = time_filter_bounds(df, filters['date'])
+    df = df.iloc[start:stop]
+    if filters['stations']:
+        df = df[df['station'].isin(filters['stations'])]
     return df
 
 
+def make_filter_key(df: pd.DataFrame, filters: dict) -> tuple:
+    """
+    Gera uma chave barata e estável para os dados filtrados.
+    
+    Usada como argumento das funções em cache no lugar do DataFrame, para que
+    o Streamlit não precise calcular o hash de todas as linhas a cada rerun.
+    """
+    newest = df['timestamp'].iloc[-1] if len(df) else None
+    return (
+        tuple(sorted(filters['date'].items())),
+        tuple(filters['stations']),
+        len(df),
+        newest
+    )
+
+
+def latest_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Retorna a última linha de cada estação, na ordem em que aparecem.
+    
+    Trabalha sobre os códigos inteiros da coluna categórica: a primeira
+    ocorrência de cada código no array invertido é a última no original.
+    """
+    codes = df['station'].cat.codes.to_numpy()
+    _, first_from_end = np.unique(codes[::-1], return_index=True)
+    return df.iloc[np.sort(len(codes) - 1 - first_from_end)]
+
+
+@st.cache_data(ttl=300, max_entries=16)
+def latest_by_station(filter_key: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    """Retorna a última leitura de cada estação (em cache pela chave do filtro)."""
+    return latest_rows(_df)
+
+
+@st.cache_data(ttl=300, max_entries=16)
+def to_csv_bytes(filter_key: tuple, _df: pd.DataFrame) -> bytes:
+    """
+    Serializa os dados filtrados em CSV com o escritor multithread do Arrow.
+    
+    Os timestamps saem com resolução de segundos, no mesmo formato do
+    df.to_csv (2026-10-14 09:00:00). Diferente do pandas, o Arrow coloca
+    entre aspas todos os campos de texto, inclusive o cabeçalho.
+    
+    As linhas saem agrupadas por estação e em ordem cronológica dentro de
+    cada uma, como o gerador as produz (o DataFrame do app vem ordenado só
+    por timestamp, ver load_data).
+    """
+    ordered = _df.sort_values(['station', 'timestamp'], kind='stable')
+    table = pa.Table.from_pandas(ordered, preserve_index=False)
+    column = table.schema.get_field_index('timestamp')
+    if column >= 0:
+        # Leituras alinhadas à hora: truncar os nanossegundos não perde nada
+        table = table.set_column(
+            column,
+            'timestamp',
+            pc.cast(table['timestamp'], pa.timestamp('s'), safe=False)
+        )
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(table, buffer)
+    return buffer.getvalue().to_pybytes()
+
+
+@st.cache_data(ttl=300, max_entries=16)
+def corr_matrix(filter_key: tuple, _df: pd.DataFrame, params: tuple) -> pd.DataFrame:
+    """Retorna a matriz de correlação dos parâmetros (em cache pela chave do filtro)."""
+    return _df[list(params)].corr()
+
+
 # =============================================================================
 # COMPONENTES PRINCIPAIS
 # =============================================================================
@@ -127,29 +260,25 @@ def render_header():
                 unsafe_allow_html=True)
 
 
-def render_kpis(df: pd.DataFrame):
+def render_kpis(df: pd.DataFrame, latest_data: pd.DataFrame):
     """Renderiza os indicadores principais (KPIs)."""
     st.subheader("📊 Indicadores em Tempo Real")
     
-    latest_data = df.groupby('station').last().reset_index()
-    today = datetime.now().date()
-    today_alerts = len(df[
-        (df['timestamp'].dt.date == today) & 
-        (df['status'] == 'Alerta')
-    ])
-    
-    quality_score = calculate_quality_index({
-        'ph': latest_data['ph'].mean(),
-        'turbidity': latest_data['turbidity'].mean(),
-        'dissolved_oxygen': latest_data['dissolved_oxygen'].mean(),
-        'temperature': latest_data['temperature'].mean(),
-        'conductivity': latest_data['conductivity'].mean()
-    })
+    # Dados ordenados por timestamp: o dia de hoje é uma fatia contígua
+    today = pd.Timestamp(datetime.now().date())
+    today_start, today_end = df['timestamp'].searchsorted([today, today + timedelta(days=1)])
+    today_alerts = int((df['status'].iloc[today_start:today_end] == 'Alerta').sum())
+    
+    quality_score = calculate_quality_index(
+        latest_data[['ph', 'turbidity', 'dissolved_oxygen', 'temperature', 'conductivity']]
+        .mean()
+        .to_dict()
+    )
     
     metrics = [
         {
             "label": "Estações Ativas",
-            "value": len(df['station'].unique()),
+            "value": len(latest_data),
             "delta": None,
             "status": "good"
         },
@@ -176,7 +305,12 @@ def render_kpis(df: pd.DataFrame):
     create_kpi_row(metrics)
 
 
-def render_charts(df: pd.DataFrame, selected_params: list, selected_stations: list):
+def render_charts(
+    df: pd.DataFrame,
+    selected_params: list,
+    selected_stations: list,
+    filter_key: tuple
+):
     """Renderiza os gráficos principais."""
     if not selected_params or not selected_stations:
         st.info("👈 Selecione parâmetros e estações no menu lateral para visualizar os gráficos.")
@@ -184,18 +318,7 @@ def render_charts(df: pd.DataFrame, selected_params: list, selected_stations: li
     
     st.subheader("📈 Tendências de Qualidade da Água")
     
-    # Gráfico de linhas temporal
-    param_labels = {
-        'ph': 'pH',
-        'turbidity': 'Turbidez (NTU)',
-        'dissolved_oxygen': 'Oxigênio Dissolvido (mg/L)',
-        'temperature': 'Temperatura (°C)',
-        'conductivity': 'Condutividade (µS/cm)',
-        'total_dissolved_solids': 'Sólidos Totais Dissolvidos (mg/L)',
-        'nitrates': 'Nitratos (mg/L)'
-    }
-    
-    # Cria gráfico para o primeiro parâmetro selecionado
+    # Gráfico de linhas temporal para o primeiro parâmetro selecionado
     primary_param = selected_params[0]
     
     fig = create_line_chart(
@@ -203,48 +326,60 @@ def render_charts(df: pd.DataFrame, selected_params: list, selected_stations: li
         x='timestamp',
         y=primary_param,
         color='station',
-        title=f"Evolução de {param_labels.get(primary_param, primary_param)}"
+        title=f"Evolução de {PARAM_LABELS.get(primary_param, primary_param)}"
     )
     st.plotly_chart(fig, use_container_width=True)
     
     # Mapa de calor de correlação se houver múltiplos parâmetros
     if len(selected_params) > 1:
         st.subheader("🔥 Correlação entre Parâmetros")
-        corr_data = df[selected_params].corr()
+        corr_data = corr_matrix(filter_key, df, tuple(selected_params))
         fig_heatmap = create_heatmap(corr_data)
         st.plotly_chart(fig_heatmap, use_container_width=True)
 
 
-def render_station_details(df: pd.DataFrame, selected_stations: list):
+def render_station_details(latest_data: pd.DataFrame, selected_stations: list):
     """Renderiza análise detalhada por estação."""
     if not selected_stations:
         return
     
     st.subheader("🏭 Análise Detalhada por Estação")
     
+    # Scores do radar de todas as estações calculados de uma só vez: (n, 5)
+    radar_scores = calculate_radar_scores(
+        latest_data['ph'].to_numpy(),
+        latest_data['turbidity'].to_numpy(),
+        latest_data['dissolved_oxygen'].to_numpy(),
+        latest_data['temperature'].to_numpy(),
+        latest_data['conductivity'].to_numpy()
+    )
+    positions = {name: i for i, name in enumerate(latest_data['station'])}
+    # Registros NumPy para o acesso por estação: ler um campo de um registro
+    # evita montar uma Series (de dtype object) a cada iloc
+    records = latest_data.to_records(index=False)
+    
+    # Status das métricas exibidas, classificados por coluna de uma só vez
+    status_codes = {
+        param: classify_array(latest_data[param].to_numpy(), param)
+        for param, _, _ in PARAMS_TO_SHOW
+    }
+    
     for station in selected_stations:
-        station_df = df[df['station'] == station]
-        if station_df.empty:
+        i = positions.get(station)
+        if i is None:
             continue
             
-        latest = station_df.iloc[-1]
-        location = station_df['location'].iloc[0]
+        latest = records[i]
+        location = latest['location']
         
         with st.expander(f"📍 {station} - {location}", expanded=True):
             # Métricas em colunas
             cols = st.columns(4)
             
-            params_to_show = [
-                ('ph', 'pH', ''),
-                ('turbidity', 'Turbidez', ' NTU'),
-                ('dissolved_oxygen', 'O₂ Dissolvido', ' mg/L'),
-                ('temperature', 'Temperatura', '°C')
-            ]
-            
-            for idx, (param, label, unit) in enumerate(params_to_show):
+            for idx, (param, label, unit) in enumerate(PARAMS_TO_SHOW):
                 with cols[idx]:
                     value = latest[param]
-                    status = get_quality_status(value, param)
+                    status = QUALITY_STATUSES[status_codes[param][i]]
                     formatted_value = format_number(value) + unit
                     
                     st.metric(
@@ -255,33 +390,34 @@ def render_station_details(df: pd.DataFrame, selected_stations: list):
                     )
             
             # Gráfico de radar para qualidade geral
-            categories = ['pH', 'Turbidez', 'O₂', 'Temperatura', 'Condutividade']
-            values = [
-                min(100, max(0, (latest['ph'] / 8.5) * 100)),
-                min(100, max(0, 100 - (latest['turbidity'] / 5) * 100)),
-                min(100, max(0, (latest['dissolved_oxygen'] / 10) * 100)),
-                min(100, max(0, 100 - abs(latest['temperature'] - 25) * 2)),
-                min(100, max(0, 100 - (latest['conductivity'] / 400) * 100))
-            ]
+            values = radar_scores[i].tolist()
             
-            fig_radar = create_radar_chart(categories, values, f"Índice de Qualidade - {station}")
+            fig_radar = create_radar_chart(RADAR_CATEGORIES, values, f"Índice de Qualidade - {station}")
             st.plotly_chart(fig_radar, use_container_width=True)
 
 
-def render_alerts(df: pd.DataFrame):
+def render_alerts(latest_data: pd.DataFrame):
     """Renderiza seção de alertas e recomendações."""
     st.subheader("🚨 Alertas e Recomendações")
     
-    latest_data = df.groupby('station').last().reset_index()
-    alerts = []
+    stations = latest_data['station'].to_numpy()
+    ph = latest_data['ph'].to_numpy()
+    turbidity = latest_data['turbidity'].to_numpy()
+    oxygen = latest_data['dissolved_oxygen'].to_numpy()
+    
+    # Comparações vetorizadas; só as estações com problema passam pelo Python
+    ph_bad = (ph < 6.5) | (ph > 8.5)
+    turbidity_bad = turbidity > 5
+    oxygen_bad = oxygen < 6
     
-    for _, row in latest_data.iterrows():
-        if row['ph'] < 6.5 or row['ph'] > 8.5:
-            alerts.append(f"⚠️ **{row['station']}**: pH fora do padrão ({format_number(row['ph'])})")
-        if row['turbidity'] > 5:
-            alerts.append(f"⚠️ **{row['station']}**: Turbidez elevada ({format_number(row['turbidity'])} NTU)")
-        if row['dissolved_oxygen'] < 6:
-            alerts.append(f"⚠️ **{row['station']}**: Oxigênio dissolvido baixo ({format_number(row['dissolved_oxygen'])} mg/L)")
+    alerts = []
+    for i in np.flatnonzero(ph_bad | turbidity_bad | oxygen_bad):
+        if ph_bad[i]:
+            alerts.append(f"⚠️ **{stations[i]}**: pH fora do padrão ({format_number(ph[i])})")
+        if turbidity_bad[i]:
+            alerts.append(f"⚠️ **{stations[i]}**: Turbidez elevada ({format_number(turbidity[i])} NTU)")
+        if oxygen_bad[i]:
+            alerts.append(f"⚠️ **{stations[i]}**: Oxigênio dissolvido baixo ({format_number(oxygen[i])} mg/L)")
     
     if alerts:
         for alert in alerts[:5]:
@@ -292,14 +428,19 @@ def render_alerts(df: pd.DataFrame):
         st.success("✅ Todos os parâmetros estão dentro dos limites aceitáveis!")
 
 
-def render_export(df: pd.DataFrame):
-    """Renderiza opções de exportação de dados."""
+@st.fragment
+def render_export(df: pd.DataFrame, filter_key: tuple):
+    """
+    Renderiza opções de exportação de dados.
+    
+    Como fragmento, os botões desta seção reexecutam apenas a própria seção.
+    """
     st.subheader("📥 Exportar Dados")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        csv = df.to_csv(index=False).encode('utf-8')
+        csv = to_csv_bytes(filter_key, df)
         filename = generate_export_filename()
         st.download_button(
             label="📄 Download CSV",
@@ -336,30 +477,32 @@ def main():
     render_header()
     
     # Carrega dados
-    df_full = generate_water_quality_data(days=30)
+    df_full = load_data(30)
     
     # Sidebar com filtros
     filters = create_sidebar_filters(df_full)
     
     # Aplica filtros
-    df_filtered = apply_time_filter(df_full, filters['date'])
-    if filters['stations']:
-        df_filtered = df_filtered[df_filtered['station'].isin(filters['stations'])]
+    df_filtered = apply_filters(df_full, filters)
+    filter_key = make_filter_key(df_filtered, filters)
+    
+    # Última leitura por estação, compartilhada entre KPIs, detalhes e alertas
+    latest_data = latest_by_station(filter_key, df_filtered)
     
     # Renderiza seções do dashboard
-    render_kpis(df_filtered)
+    render_kpis(df_filtered, latest_data)
     
     st.divider()
-    render_charts(df_filtered, filters['parameters'], filters['stations'])
+    render_charts(df_filtered, filters['parameters'], filters['stations'], filter_key)
     
     st.divider()
-    render_station_details(df_filtered, filters['stations'])
+    render_station_details(latest_data, filters['stations'])
     
     st.divider()
-    render_alerts(df_filtered)
+    render_alerts(latest_data)
     
     st.divider()
-    render_export(df_filtered)
+    render_export(df_filtered, filter_key)
     
     render_footer()
 
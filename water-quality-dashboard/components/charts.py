@@ -1,13 +1,57 @@
 """Custom chart components using Plotly."""
 
+import numpy as np
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import streamlit as st
+from utils import downsample_indices
 
-def create_line_chart(df, x, y, color=None, title=""):
-    """Create an interactive line chart."""
-    fig = px.line(df, x=x, y=y, color=color, title=title)
-    fig.update_layout(template='plotly_white')
+def _group_positions(df, color):
+    """Return (name, row positions) pairs, grouping rows by the color column.
+
+    Uses one stable argsort of the factorized labels and splits it at the
+    group boundaries, instead of masking the frame once per group.
+    """
+    if not color:
+        return [(None, np.arange(len(df)))]
+    codes, names = pd.factorize(df[color])
+    # Missing labels get code -1; drop those rows (as px.line did) so each
+    # split stays paired with its own name
+    labeled = np.flatnonzero(codes >= 0)
+    order = labeled[np.argsort(codes[labeled], kind='stable')]
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return list(zip(names, np.split(order, bounds)))
+
+def _downsample_positions(groups, values, max_points):
+    """Keep at most max_points positions per group using min/max downsampling."""
+    return [
+        (name, idx[downsample_indices(values[idx], max_points)])
+        for name, idx in groups
+    ]
+
+def create_line_chart(df, x, y, color=None, title="", max_points=2000):
+    """Create an interactive WebGL line chart, downsampling long traces."""
+    arr_x = df[x].to_numpy()
+    arr_y = df[y].to_numpy()
+    groups = _group_positions(df, color)
+    if len(df) > max_points:
+        groups = _downsample_positions(groups, arr_y, max_points)
+
+    fig = go.Figure()
+    for name, idx in groups:
+        fig.add_trace(go.Scattergl(
+            x=arr_x[idx],
+            y=arr_y[idx],
+            mode='lines',
+            name=str(name) if color else y
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x,
+        yaxis_title=y,
+        legend_title_text=color,
+        template='plotly_white'
+    )
     return fig
 
 def create_radar_chart(categories, values, title="Quality Index"):
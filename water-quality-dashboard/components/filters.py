@@ -1,10 +1,14 @@
 """Filter components for sidebar."""
 
-import streamlit as st
 from datetime import datetime, timedelta
 
+# streamlit is imported lazily, like in metrics.py, so that importing the
+# components package does not load it
+
 def create_date_filter():
     """Create date range filter."""
+    import streamlit as st
+    
     st.subheader("📅 Período de Análise")
     
     time_range = st.selectbox(
@@ -24,6 +28,8 @@ def create_date_filter():
 
 def create_station_filter(available_stations):
     """Create station multi-select filter."""
+    import streamlit as st
+    
     st.subheader("🏭 Estações")
     
     selected = st.multiselect(
@@ -36,12 +42,14 @@ def create_station_filter(available_stations):
 
 def create_sidebar_filters(df):
     """Create complete sidebar with all filters."""
+    import streamlit as st
+    
     with st.sidebar:
         st.image("https://img.icons8.com/color/96/water.png", width=80)
         st.title("⚙️ Configurações")
         
         date_filter = create_date_filter()
-        stations = create_station_filter(df['station'].unique())
+        stations = create_station_filter(df['station'].cat.categories.tolist())
         
         st.subheader("📊 Parâmetros")
         parameters = st.multiselect(
@@ -52,6 +60,7 @@ def create_sidebar_filters(df):
         
         if st.button("🔄 Atualizar", type="primary"):
             st.cache_data.clear()
+            st.cache_resource.clear()
             st.rerun()
     
     return {
@@ -1,11 +1,17 @@
 """Metric card components for KPIs."""
 
-import streamlit as st
-from utils import get_quality_status, get_quality_color
+from utils import STATUS_COLORS, DEFAULT_STATUS_COLOR
+
+# streamlit is imported inside each function that renders, so importing this
+# module (e.g. from notebooks or scripts) does not pay streamlit's start-up cost
+
+_INDICATOR_TEMPLATE = "<span style='color:{color};font-size:1.2rem'>● {label}</span>"
 
 def create_metric_card(label, value, delta=None, status="good"):
     """Create a styled metric card."""
-    color = get_quality_color(status)
+    import streamlit as st
+    
+    color = STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
     
     col1, col2 = st.columns([1, 3])
     with col1:
@@ -18,16 +24,15 @@ def create_metric_card(label, value, delta=None, status="good"):
 
 def create_status_indicator(status):
     """Create a colored status indicator."""
-    colors = {
-        'good': '#00C851',
-        'warning': '#ffbb33', 
-        'critical': '#ff4444'
-    }
-    color = colors.get(status, '#9e9e9e')
-    return f"<span style='color:{color};font-size:1.2rem'>● {status.upper()}</span>"
+    return _INDICATOR_TEMPLATE.format(
+        color=STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR),
+        label=status.upper()
+    )
 
 def create_kpi_row(metrics_list):
     """Create a row of KPI cards."""
+    import streamlit as st
+    
     cols = st.columns(len(metrics_list))
     for idx, metric in enumerate(metrics_list):
         with cols[idx]:
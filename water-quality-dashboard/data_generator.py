@@ -7,8 +7,11 @@ Simula sensores IoT em estações de monitoramento ambiental.
 
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from pandas.tseries.frequencies import to_offset
 
 
 class WaterQualityDataGenerator:
@@ -28,8 +31,15 @@ class WaterQualityDataGenerator:
         {"name": "Estação E", "location": "Estação de Tratamento", "base_ph": 7.0, "base_temp": 21},
     ]
     
-    # Probabilidades de status
-    STATUS_PROBABILITIES = [0.85, 0.12, 0.03]  # Normal, Alerta, Crítico
+    # Status possíveis e suas probabilidades
+    STATUS_LABELS = ['Normal', 'Alerta', 'Crítico']
+    STATUS_PROBABILITIES = [0.85, 0.12, 0.03]
+    
+    # Parâmetros numéricos medidos, na ordem das colunas do DataFrame
+    MEASUREMENT_COLUMNS = [
+        'ph', 'turbidity', 'dissolved_oxygen', 'temperature',
+        'conductivity', 'total_dissolved_solids', 'nitrates',
+    ]
     
     def __init__(self, seed: int = 42):
         """
@@ -39,13 +49,14 @@ class WaterQualityDataGenerator:
             seed: Seed para o gerador de números aleatórios
         """
         self.seed = seed
-        np.random.seed(seed)
+        # Gerador próprio (PCG64) em vez do estado global legado do NumPy
+        self.rng = np.random.default_rng(seed)
     
     def generate(
         self,
         days: int = 30,
         stations: Optional[List[Dict]] = None,
-        frequency: str = 'H'
+        frequency: str = 'h'
     ) -> pd.DataFrame:
         """
         Gera dados sintéticos de qualidade da água.
@@ -53,7 +64,7 @@ class WaterQualityDataGenerator:
         Args:
             days: Número de dias de dados históricos
             stations: Lista de configurações de estações (usa default se None)
-            frequency: Frequência das leituras ('H' = horária, 'D' = diária)
+            frequency: Frequência das leituras ('h' = horária, 'D' = diária)
         
         Returns:
             DataFrame com dados de qualidade da água
@@ -61,105 +72,213 @@ class WaterQualityDataGenerator:
         if stations is None:
             stations = self.DEFAULT_STATIONS
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        dates = pd.date_range(start=start_date, end=end_date, freq=frequency)
+        dates = self._build_time_index(days, frequency)
+        
+        # Fatores temporais: iguais para todas as estações, calculados uma vez
+        hour_factor = np.sin(2 * np.pi * dates.hour.to_numpy() / 24)
+        day_factor = np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365)
+        
+        # Leituras numéricas num único bloco float32 em ordem de coluna (Fortran):
+        # cada parâmetro fica contíguo na memória, o que favorece as agregações
+        # por coluna do dashboard. float32 basta para leituras de sensor
+        # (~7 dígitos significativos) e usa metade da memória
+        n = len(dates)
+        total_rows = n * len(stations)
+        measurements = np.empty(
+            (total_rows, len(self.MEASUREMENT_COLUMNS)), dtype=np.float32, order='F'
+        )
+        status_codes = np.empty(total_rows, dtype=np.int8)
         
-        data = []
-        for station_config in stations:
-            station_data = self._generate_station_data(
-                station_config, dates
+        # Estações são independentes: cada uma recebe um fluxo aleatório próprio
+        # (reprodutível qualquer que seja a ordem de execução) e é gerada numa
+        # thread; o trabalho é NumPy vetorizado, que libera o GIL
+        station_rngs = self.rng.spawn(len(stations))
+        with ThreadPoolExecutor(max_workers=max(1, len(stations))) as executor:
+            results = executor.map(
+                self._generate_station_data,
+                stations,
+                repeat(hour_factor),
+                repeat(day_factor),
+                station_rngs,
             )
-            data.extend(station_data)
+            station_results = list(results)
+        
+        for s, station_data in enumerate(station_results):
+            rows = slice(s * n, (s + 1) * n)
+            for j, name in enumerate(self.MEASUREMENT_COLUMNS):
+                measurements[rows, j] = station_data[name]
+            status_codes[rows] = station_data['status']
+        
+        df = pd.DataFrame(measurements, columns=self.MEASUREMENT_COLUMNS, copy=False)
+        
+        # Rótulos como categóricas construídas direto dos códigos inteiros
+        station_idx = np.repeat(np.arange(len(stations)), n)
+        name_codes, names = pd.factorize(np.array([s["name"] for s in stations], dtype=object))
+        location_codes, locations = pd.factorize(np.array([s["location"] for s in stations], dtype=object))
+        
+        df.insert(0, 'timestamp', np.tile(dates.to_numpy(), len(stations)))
+        df.insert(1, 'station', pd.Categorical.from_codes(name_codes[station_idx], names))
+        df.insert(2, 'location', pd.Categorical.from_codes(location_codes[station_idx], locations))
+        df['status'] = pd.Categorical.from_codes(status_codes, self.STATUS_LABELS)
+        
+        return df
+    
+    def _build_time_index(self, days: int, frequency: str) -> pd.DatetimeIndex:
+        """
+        Monta o índice temporal terminando no último instante alinhado à frequência.
+        
+        Alinhar o fim (ex.: à hora cheia) mantém os mesmos timestamps entre
+        chamadas dentro do mesmo período, o que favorece o cache a jusante.
+        O índice é construído por aritmética inteira sobre datetime64.
+        
+        Args:
+            days: Número de dias de dados históricos
+            frequency: Frequência das leituras ('h' = horária, 'D' = diária)
         
-        return pd.DataFrame(data)
+        Returns:
+            Índice com days * passos por dia + 1 timestamps, em ordem crescente
+        """
+        step = pd.Timedelta(to_offset(frequency))
+        end = pd.Timestamp.now().floor(step)
+        n = int(pd.Timedelta(days=days) // step) + 1
+        offsets = np.arange(n - 1, -1, -1, dtype=np.int64) * step.value
+        return pd.DatetimeIndex(end.to_datetime64() - offsets.astype('timedelta64[ns]'))
     
     def _generate_station_data(
         self,
         station_config: Dict,
-        dates: pd.DatetimeIndex
-    ) -> List[Dict]:
+        hour_factor: np.ndarray,
+        day_factor: np.ndarray,
+        rng: np.random.Generator
+    ) -> Dict[str, np.ndarray]:
         """
         Gera dados para uma estação específica.
         
+        Todas as leituras são calculadas de uma vez como arrays NumPy,
+        sem laço Python por timestamp. Cada estação sorteia do seu próprio
+        gerador, o que permite gerar estações em paralelo. Os cálculos
+        acumulam in-place sobre um único buffer por parâmetro, evitando
+        um array temporário a cada operação.
+        
         Args:
             station_config: Configuração da estação
-            dates: Índice de datas para geração
+            hour_factor: Fator diurno de cada timestamp
+            day_factor: Fator sazonal de cada timestamp
+            rng: Gerador de números aleatórios exclusivo da estação
         
         Returns:
-            Lista de dicionários com leituras da estação
+            Dicionário coluna -> array com as leituras da estação
+            (o status vem como códigos de STATUS_LABELS)
         """
-        station_name = station_config["name"]
-        location = station_config["location"]
-        base_ph = station_config["base_ph"] + np.random.normal(0, 0.3)
-        base_temp = station_config["base_temp"] + np.random.normal(0, 2)
+        n = len(hour_factor)
+        base_ph = station_config["base_ph"] + rng.normal(0, 0.3)
+        base_temp = station_config["base_temp"] + rng.normal(0, 2)
         
-        readings = []
-        for date in dates:
-            # Fatores temporais
-            hour_factor = np.sin(2 * np.pi * date.hour / 24)
-            day_of_year = date.timetuple().tm_yday
-            day_factor = np.sin(2 * np.pi * day_of_year / 365)
-            
-            # Variação aleatória do dia
-            daily_noise = np.random.normal(0, 0.2)
-            
-            reading = {
-                'timestamp': date,
-                'station': station_name,
-                'location': location,
-                'ph': self._calculate_ph(base_ph, hour_factor, daily_noise),
-                'turbidity': self._calculate_turbidity(hour_factor),
-                'dissolved_oxygen': self._calculate_dissolved_oxygen(hour_factor),
-                'temperature': self._calculate_temperature(base_temp, hour_factor, day_factor),
-                'conductivity': self._calculate_conductivity(hour_factor),
-                'total_dissolved_solids': self._calculate_tds(),
-                'nitrates': self._calculate_nitrates(),
-                'status': self._determine_status()
-            }
-            readings.append(reading)
+        # Variação aleatória do dia
+        daily_noise = rng.normal(0, 0.2, n)
         
-        return readings
+        return {
+            'ph': self._calculate_ph(base_ph, hour_factor, daily_noise),
+            'turbidity': self._calculate_turbidity(rng, hour_factor),
+            'dissolved_oxygen': self._calculate_dissolved_oxygen(rng, hour_factor),
+            'temperature': self._calculate_temperature(rng, base_temp, hour_factor, day_factor),
+            'conductivity': self._calculate_conductivity(rng, hour_factor),
+            'total_dissolved_solids': self._calculate_tds(rng, n),
+            'nitrates': self._calculate_nitrates(rng, n),
+            'status': self._determine_status(rng, n)
+        }
     
-    def _calculate_ph(self, base: float, hour_factor: float, noise: float) -> float:
+    def _calculate_ph(
+        self,
+        base: float,
+        hour_factor: np.ndarray,
+        noise: np.ndarray
+    ) -> np.ndarray:
         """Calcula pH com variação diurna."""
-        return np.clip(base + 0.5 * hour_factor + noise, 4.0, 10.0)
+        values = base + 0.5 * hour_factor
+        values += noise
+        return np.clip(values, 4.0, 10.0, out=values)
     
-    def _calculate_turbidity(self, hour_factor: float) -> float:
+    def _calculate_turbidity(
+        self,
+        rng: np.random.Generator,
+        hour_factor: np.ndarray
+    ) -> np.ndarray:
         """Calcula turbidez (NTU)."""
-        return max(0, 2 + 3 * np.random.exponential(0.5) + hour_factor * 0.5)
+        values = rng.exponential(0.5, len(hour_factor))
+        values *= 3
+        values += 2
+        values += hour_factor * 0.5
+        return np.maximum(values, 0, out=values)
     
-    def _calculate_dissolved_oxygen(self, hour_factor: float) -> float:
+    def _calculate_dissolved_oxygen(
+        self,
+        rng: np.random.Generator,
+        hour_factor: np.ndarray
+    ) -> np.ndarray:
         """Calcula oxigênio dissolvido (mg/L)."""
-        return max(0, 8 - 0.5 * hour_factor + np.random.normal(0, 0.5))
+        values = 8 - 0.5 * hour_factor
+        values += rng.normal(0, 0.5, len(hour_factor))
+        return np.maximum(values, 0, out=values)
     
     def _calculate_temperature(
         self,
+        rng: np.random.Generator,
         base: float,
-        hour_factor: float,
-        day_factor: float
-    ) -> float:
+        hour_factor: np.ndarray,
+        day_factor: np.ndarray
+    ) -> np.ndarray:
         """Calcula temperatura (°C) com variação diurna e sazonal."""
-        return base + 3 * hour_factor + 5 * day_factor + np.random.normal(0, 0.5)
+        values = base + 3 * hour_factor
+        values += 5 * day_factor
+        values += rng.normal(0, 0.5, len(hour_factor))
+        return values
     
-    def _calculate_conductivity(self, hour_factor: float) -> float:
+    def _calculate_conductivity(
+        self,
+        rng: np.random.Generator,
+        hour_factor: np.ndarray
+    ) -> np.ndarray:
         """Calcula condutividade (µS/cm)."""
-        return max(0, 200 + 50 * np.random.normal(0, 1) + 20 * hour_factor)
+        values = rng.standard_normal(len(hour_factor))
+        values *= 50
+        values += 200
+        values += 20 * hour_factor
+        return np.maximum(values, 0, out=values)
     
-    def _calculate_tds(self) -> float:
+    def _calculate_tds(
+        self,
+        rng: np.random.Generator,
+        n: int
+    ) -> np.ndarray:
         """Calcula sólidos totais dissolvidos (mg/L)."""
-        return max(0, 150 + 30 * np.random.normal(0, 1))
+        values = rng.standard_normal(n)
+        values *= 30
+        values += 150
+        return np.maximum(values, 0, out=values)
     
-    def _calculate_nitrates(self) -> float:
+    def _calculate_nitrates(
+        self,
+        rng: np.random.Generator,
+        n: int
+    ) -> np.ndarray:
         """Calcula nitratos (mg/L)."""
-        return max(0, 2 + 3 * np.random.normal(0, 1))
+        values = rng.standard_normal(n)
+        values *= 3
+        values += 2
+        return np.maximum(values, 0, out=values)
     
-    def _determine_status(self) -> str:
-        """Determina o status da leitura baseado em probabilidades."""
-        return np.random.choice(
-            ['Normal', 'Alerta', 'Crítico'],
+    def _determine_status(
+        self,
+        rng: np.random.Generator,
+        n: int
+    ) -> np.ndarray:
+        """Sorteia os códigos de status (índices de STATUS_LABELS) por probabilidade."""
+        return rng.choice(
+            len(self.STATUS_LABELS),
+            size=n,
             p=self.STATUS_PROBABILITIES
-        )
+        ).astype(np.int8)
     
     def add_anomaly(
         self,
@@ -173,6 +292,10 @@ class WaterQualityDataGenerator:
         """
         Adiciona uma anomalia artificial aos dados (para testes).
         
+        Espera os timestamps de cada estação em ordem crescente (como saem de
+        generate), o que permite achar a janela por busca binária. Só a coluna
+        alterada é copiada; as demais são compartilhadas com o DataFrame original.
+        
         Args:
             df: DataFrame original
             station: Nome da estação
@@ -184,18 +307,26 @@ class WaterQualityDataGenerator:
         Returns:
             DataFrame modificado com anomalia
         """
-        df_modified = df.copy()
-        
-        mask = (
-            (df_modified['station'] == station) &
-            (df_modified['timestamp'] >= start_time) &
-            (df_modified['timestamp'] <= start_time + timedelta(hours=duration_hours))
-        )
+        rows = np.flatnonzero(df['station'] == station)
+        timestamps = df['timestamp'].to_numpy()[rows]
+        start = pd.Timestamp(start_time).to_datetime64()
+        end = pd.Timestamp(start_time + timedelta(hours=duration_hours)).to_datetime64()
+        window = rows[
+            np.searchsorted(timestamps, start, side='left'):
+            np.searchsorted(timestamps, end, side='right')
+        ]
         
         multipliers = {'low': 1.3, 'medium': 1.6, 'high': 2.0}
         multiplier = multipliers.get(severity, 1.5)
         
-        df_modified.loc[mask, parameter] *= multiplier
+        # Opera no array NumPy da coluna, sem a maquinaria de indexação do pandas
+        values = df[parameter].to_numpy(copy=True)
+        values[window] *= multiplier
+        
+        # assign() copiaria todas as colunas (sem copy-on-write); a cópia rasa
+        # compartilha as demais e só substitui a coluna alterada
+        df_modified = df.copy(deep=False)
+        df_modified[parameter] = values
         
         return df_modified
 
@@ -237,11 +368,11 @@ if __name__ == "__main__":
     print("🔄 Gerando dados de teste...")
     
     generator = WaterQualityDataGenerator(seed=42)
-    df = generator.generate(days=7, frequency='H')
+    df = generator.generate(days=7, frequency='h')
     
     print(f"✅ Dados gerados: {len(df)} leituras")
     print(f"\n📊 Resumo por estação:")
-    print(df.groupby('station')['ph'].agg(['mean', 'std', 'min', 'max']))
+    print(df.groupby('station', observed=True)['ph'].agg(['mean', 'std', 'min', 'max']))
     
     print(f"\n📈 Primeiras 5 leituras:")
     print(df.head())
@@ -4,17 +4,35 @@ Helper functions and utilities.
 """
 
 from .helpers import (
+    QUALITY_LIMITS,
+    QUALITY_STATUSES,
+    QUALITY_WEIGHTS,
+    STATUS_COLORS,
+    DEFAULT_STATUS_COLOR,
     format_number,
     get_quality_status,
+    classify_array,
     get_quality_color,
     calculate_quality_index,
-    generate_export_filename
+    calculate_quality_index_df,
+    calculate_radar_scores,
+    generate_export_filename,
+    downsample_indices
 )
 
 __all__ = [
+    'QUALITY_LIMITS',
+    'QUALITY_STATUSES',
+    'QUALITY_WEIGHTS',
+    'STATUS_COLORS',
+    'DEFAULT_STATUS_COLOR',
     'format_number',
     'get_quality_status',
+    'classify_array',
     'get_quality_color',
     'calculate_quality_index',
-    'generate_export_filename'
+    'calculate_quality_index_df',
+    'calculate_radar_scores',
+    'generate_export_filename',
+    'downsample_indices'
 ]
\ No newline at end of file
@@ -1,61 +1,178 @@
 """Helper functions for data processing and formatting."""
 
+from bisect import bisect_right
 from datetime import datetime
+from math import inf, nextafter
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+
+# Acceptable (min, max) ranges per parameter, WHO/CONAMA standards
+QUALITY_LIMITS = {
+    'ph': (6.5, 8.5),
+    'turbidity': (0, 5),
+    'dissolved_oxygen': (6, 14),
+    'temperature': (0, 30),
+    'conductivity': (0, 400),
+    'nitrates': (0, 10)
+}
+
+# Status names indexed by the codes returned from classify_array
+QUALITY_STATUSES = ('good', 'warning', 'critical')
+
+def _status_bounds(min_val, max_val):
+    """Sorted cut points splitting values into the five status ranges.
+
+    With bisect_right the ranges are: <= 0.8*min critical, < min warning,
+    min..max good, < 1.2*max warning, >= 1.2*max critical. The inclusive
+    ends are nudged with nextafter, and the good range wins when min is 0.
+    """
+    return (
+        min(nextafter(min_val * 0.8, inf), min_val),
+        min_val,
+        nextafter(max_val, inf),
+        max_val * 1.2
+    )
+
+# Precomputed cut points per parameter and the status of each range
+_STATUS_BOUNDS = {param: _status_bounds(*limits) for param, limits in QUALITY_LIMITS.items()}
+_RANGE_STATUSES = ('critical', 'warning', 'good', 'warning', 'critical')
+
+# Lookup table form for classify_array: cut points as arrays with a trailing
+# NaN (searchsorted orders NaN after +inf, so NaN lands in a sixth slot) and
+# the status code of each slot, NaN counting as warning
+_STATUS_BOUND_ARRAYS = {
+    param: np.array(bounds + (np.nan,)) for param, bounds in _STATUS_BOUNDS.items()
+}
+_RANGE_CODES = np.array([2, 1, 0, 1, 2, 1], dtype=np.int8)
+
+# Simplified WQI: parameter weights and points per status code
+QUALITY_WEIGHTS = {'ph': 0.2, 'turbidity': 0.2, 'dissolved_oxygen': 0.3,
+                   'temperature': 0.1, 'conductivity': 0.2}
+_STATUS_POINTS = np.array([100.0, 50.0, 0.0])
+
+# Color per status, built once and read-only
+STATUS_COLORS = MappingProxyType({
+    'good': '#00C851',
+    'warning': '#ffbb33',
+    'critical': '#ff4444',
+    'unknown': '#9e9e9e'
+})
+DEFAULT_STATUS_COLOR = '#9e9e9e'
+
+# Bound str.format methods for the common precisions, so the format spec
+# is not rebuilt from `decimals` on every call
+_NUMBER_FORMATS = tuple(("{:." + str(d) + "f}").format for d in range(7))
 
 def format_number(value, decimals=2):
     """Format number with specified decimal places."""
+    if 0 <= decimals < len(_NUMBER_FORMATS):
+        return _NUMBER_FORMATS[decimals](value)
     return f"{value:.{decimals}f}"
 
 def get_quality_status(value, param):
     """Return quality status based on WHO/CONAMA standards."""
-    limits = {
-        'ph': (6.5, 8.5),
-        'turbidity': (0, 5),
-        'dissolved_oxygen': (6, 14),
-        'temperature': (0, 30),
-        'conductivity': (0, 400),
-        'nitrates': (0, 10)
-    }
-    
-    if param not in limits:
+    bounds = _STATUS_BOUNDS.get(param)
+    if bounds is None:
         return 'unknown'
-    
-    min_val, max_val = limits[param]
-    if min_val <= value <= max_val:
-        return 'good'
-    elif value <= min_val * 0.8 or value >= max_val * 1.2:
-        return 'critical'
-    else:
+    # Compare as a Python float: NumPy float32 scalars would compare in
+    # float32, where the nextafter-shifted cut points round back onto the limits
+    value = float(value)
+    if value != value:
+        # NaN fails every comparison; keep the historical 'warning'
         return 'warning'
+    return _RANGE_STATUSES[bisect_right(bounds, value)]
+
+def classify_array(values, param):
+    """Vectorized get_quality_status.
+
+    Returns int8 codes indexing QUALITY_STATUSES (0 good, 1 warning,
+    2 critical), or -1 for every value when the parameter is unknown.
+    Values are compared as float64, the same rule get_quality_status
+    applies, so float32 columns classify like their scalar readings.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bounds = _STATUS_BOUND_ARRAYS.get(param)
+    if bounds is None:
+        return np.full(values.shape, -1, dtype=np.int8)
+
+    # Binary search for each value's range, then one gather from the table
+    return _RANGE_CODES[np.searchsorted(bounds, values, side='right')]
 
 def get_quality_color(status):
     """Return color code for status."""
-    colors = {
-        'good': '#00C851',
-        'warning': '#ffbb33',
-        'critical': '#ff4444',
-        'unknown': '#9e9e9e'
-    }
-    return colors.get(status, '#9e9e9e')
+    return STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
 
 def calculate_quality_index(readings):
-    """Calculate overall water quality index (0-100)."""
-    # Simplified WQI calculation
-    weights = {'ph': 0.2, 'turbidity': 0.2, 'dissolved_oxygen': 0.3, 
-               'temperature': 0.1, 'conductivity': 0.2}
-    
+    """Calculate overall water quality index (0-100) for a single reading."""
     score = 0
     for param, value in readings.items():
-        if param in weights:
+        if param in QUALITY_WEIGHTS:
             status = get_quality_status(value, param)
             if status == 'good':
-                score += weights[param] * 100
+                score += QUALITY_WEIGHTS[param] * 100
             elif status == 'warning':
-                score += weights[param] * 50
+                score += QUALITY_WEIGHTS[param] * 50
     
     return min(100, max(0, score))
 
+def calculate_quality_index_df(df):
+    """Calculate the water quality index (0-100) for every row of a DataFrame.
+
+    Vectorized counterpart of calculate_quality_index: each weighted
+    parameter present in df is classified once with classify_array and
+    its points gathered by status code. Returns a float Series named
+    'quality_index', aligned on df.index.
+    """
+    score = np.zeros(len(df))
+    for param, weight in QUALITY_WEIGHTS.items():
+        if param in df:
+            codes = classify_array(df[param].to_numpy(), param)
+            score += weight * _STATUS_POINTS[codes]
+    np.clip(score, 0, 100, out=score)
+    return pd.Series(score, index=df.index, name='quality_index')
+
+def calculate_radar_scores(ph, turbidity, dissolved_oxygen, temperature, conductivity):
+    """Return the 0-100 radar scores for pH, turbidity, O2, temperature and conductivity.
+
+    Accepts scalars or equally shaped arrays; the scores are stacked on the
+    last axis, so a single reading yields shape (5,) and n readings (n, 5).
+    """
+    scores = np.stack([
+        np.asarray(ph, dtype=float) / 8.5 * 100,
+        100 - np.asarray(turbidity, dtype=float) / 5 * 100,
+        np.asarray(dissolved_oxygen, dtype=float) / 10 * 100,
+        100 - np.abs(np.asarray(temperature, dtype=float) - 25) * 2,
+        100 - np.asarray(conductivity, dtype=float) / 400 * 100
+    ], axis=-1)
+    return np.clip(scores, 0, 100, out=scores)
+
 def generate_export_filename():
     """Generate filename for data export."""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return f"water_quality_data_{timestamp}.csv"
\ No newline at end of file
+    return f"water_quality_data_{timestamp}.csv"
+
+def downsample_indices(values, n_out):
+    """Return sorted indices of a min/max downsampling of a series.
+
+    Splits the series into equal-size bins and keeps the minimum and the
+    maximum of each bin, plus the first and last points, so spikes survive
+    the reduction. Returns all indices when the series already fits.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+
+    inner = values[1:-1]
+    bin_size = -(-len(inner) // ((n_out - 2) // 2))
+    n_bins = -(-len(inner) // bin_size)
+    offsets = np.arange(n_bins) * bin_size + 1
+
+    padded = np.full(n_bins * bin_size, np.inf)
+    padded[:len(inner)] = inner
+    argmin = padded.reshape(n_bins, bin_size).argmin(axis=1)
+    padded[len(inner):] = -np.inf
+    argmax = padded.reshape(n_bins, bin_size).argmax(axis=1)
+
+    return np.unique(np.concatenate(([0], offsets + argmin, offsets + argmax, [n - 1])))